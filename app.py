@@ -404,6 +404,7 @@ def status():
     return jsonify(status_info), 200
 
 # --- Main Application Runner ---
+# Local development only - production runs under gunicorn (see gunicorn.conf.py).
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
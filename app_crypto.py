@@ -1,18 +1,19 @@
-import os, json, uuid, traceback, secrets, time
+import os, re, json, base64, hashlib, secrets, time, threading, collections
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
-import requests
-import jwt
-from cryptography.hazmat.primitives import serialization
+import httpx
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed, decode_dss_signature
 
 # Load environment variables
 load_dotenv()
 
-# --- CCXT (Coinbase futures via unified symbol) ---
-import ccxt
-
 # ----- Config -----
 SYMBOL = os.getenv("SYMBOL", "ETH/USD:USD-301220")  # CCXT unified symbol (your working one)
+# Coinbase product id for SYMBOL (e.g. "ET-27DEC24-CDE"). When set, orders never
+# touch ccxt; otherwise it is resolved once from the ccxt markets.
+PRODUCT_ID = os.getenv("PRODUCT_ID", "")
 REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))
 DRY_RUN = os.getenv("DRY_RUN", "false").lower() == "true"
 
@@ -22,16 +23,48 @@ COINBASE_API_SECRET = os.getenv("COINBASE_API_SECRET", "")
 
 app = Flask(__name__)
 
+# Shared HTTP/2 client for the Coinbase REST API: orders reuse one
+# multiplexed, kept-alive connection instead of reconnecting per request
+HTTP_CLIENT = httpx.Client(
+    base_url="https://api.coinbase.com",
+    http2=True,
+    timeout=REQUEST_TIMEOUT,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+
+# Order body for the fixed market-IOC schema, formatted directly instead of
+# running the generic JSON encoder. Only used when every interpolated field
+# matches _SAFE_ORDER_FIELD, so nothing needs escaping.
+_ORDER_TMPL = (
+    '{{"client_order_id":"{coid}","product_id":"{pid}","side":"{side}",'
+    '"order_configuration":{{"market_market_ioc":{{"base_size":"{sz}"}}}}}}'
+)
+_SAFE_ORDER_FIELD = re.compile(r"[A-Za-z0-9_\-:./]+")
+
+# Static order headers; only Authorization is added per request
+_ORDER_HEADERS_TEMPLATE = {"Content-Type": "application/json"}
+
+# TradingView action -> order side
+_ACTION_TO_SIDE = {"buy": "buy", "long": "buy", "sell": "sell", "short": "sell"}
+_SIDE_UPPER = {"buy": "BUY", "sell": "SELL"}
+
 # Single shared exchange instance
 _exchange = None
+# Exchange product id for SYMBOL, from PRODUCT_ID or cached once markets have loaded
+_PRODUCT_ID = PRODUCT_ID or None
 
 def get_exchange():
-    global _exchange
+    global _exchange, _PRODUCT_ID
     if _exchange is not None:
         return _exchange
     if not COINBASE_API_KEY or not COINBASE_API_SECRET:
         raise RuntimeError("Missing COINBASE_API_KEY or COINBASE_API_SECRET")
 
+    # --- CCXT (Coinbase futures via unified symbol) ---
+    # Imported lazily: only the diagnostic endpoints (and a missing PRODUCT_ID)
+    # need it, so normal webhook traffic never pays the import/market-load cost.
+    import ccxt
+
     # ccxt.coinbase with futures enabled (this matches your working bot)
     _exchange = ccxt.coinbase({
         "apiKey": COINBASE_API_KEY,
@@ -58,6 +91,8 @@ def get_exchange():
         app.logger.info(f"✅ Symbol {SYMBOL} found in markets")
         market = _exchange.markets[SYMBOL]
         app.logger.info(f"Market details: type={market.get('type')}, active={market.get('active')}, contractSize={market.get('contractSize')}")
+        if not PRODUCT_ID:
+            _PRODUCT_ID = market.get("id")
         
     except Exception as e:
         app.logger.error(f"Failed to load markets: {e}")
@@ -66,22 +101,61 @@ def get_exchange():
         
     return _exchange
 
+# Signing key is parsed once on first use; the JWS header only varies by nonce
+_PRIVATE_KEY = None
+_JWT_HEADER_PREFIX = '{"alg":"ES256","typ":"JWT","kid":' + json.dumps(COINBASE_API_KEY) + ',"nonce":"'
+
+# Pre-generated JWT nonces, topped up by a background thread so signing an
+# order doesn't have to wait on the OS RNG
+_NONCES = collections.deque(maxlen=1024)
+_NONCE_LOW_WATER = 256
+_nonce_refill = threading.Event()
+
+def _nonce_refiller():
+    while True:
+        while len(_NONCES) < _NONCES.maxlen:
+            _NONCES.append(secrets.token_hex(16))
+        _nonce_refill.clear()
+        _nonce_refill.wait()
+
+threading.Thread(target=_nonce_refiller, name="jwt-nonce-refill", daemon=True).start()
+
+def _next_nonce() -> str:
+    try:
+        nonce = _NONCES.popleft()
+    except IndexError:
+        nonce = secrets.token_hex(16)
+    if len(_NONCES) < _NONCE_LOW_WATER:
+        _nonce_refill.set()
+    return nonce
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _load_private_key():
+    global _PRIVATE_KEY
+    if _PRIVATE_KEY is not None:
+        return _PRIVATE_KEY
+
+    # Handle PEM key format - convert \n to actual newlines if needed
+    pem_key = COINBASE_API_SECRET.strip().strip('"')
+    
+    # If the PEM key contains literal \n characters (from Render), convert them to actual newlines
+    if '\\n' in pem_key:
+        pem_key = pem_key.replace('\\n', '\n')
+        app.logger.debug("Converted literal \\n to actual newlines")
+        
+    app.logger.debug(f"PEM key starts with: {pem_key[:30]}...")
+    app.logger.debug(f"PEM key contains {pem_key.count(chr(10))} actual newlines")
+    
+    _PRIVATE_KEY = serialization.load_pem_private_key(pem_key.encode(), password=None)
+    return _PRIVATE_KEY
+
 def _build_jwt(method: str, path: str) -> str:
     """Build JWT token for Coinbase API - SAME AS WORKING HFT BOT"""
     try:
-        # Handle PEM key format - convert \n to actual newlines if needed
-        pem_key = COINBASE_API_SECRET.strip().strip('"')
-        
-        # If the PEM key contains literal \n characters (from Render), convert them to actual newlines
-        if '\\n' in pem_key:
-            pem_key = pem_key.replace('\\n', '\n')
-            app.logger.debug("Converted literal \\n to actual newlines")
-            
-        app.logger.debug(f"PEM key starts with: {pem_key[:30]}...")
-        app.logger.debug(f"PEM key contains {pem_key.count(chr(10))} actual newlines")
-        
-        private_key = serialization.load_pem_private_key(pem_key.encode(), password=None)
-        now = int(time.time())
+        private_key = _load_private_key()
+        now = time.time_ns() // 1_000_000_000
         payload = {
             "sub": COINBASE_API_KEY,
             "iss": "cdp",
@@ -89,9 +163,19 @@ def _build_jwt(method: str, path: str) -> str:
             "exp": now + 120,
             "uri": f"{method} api.coinbase.com{path}",
         }
-        headers = {"kid": COINBASE_API_KEY, "nonce": secrets.token_hex()}
-        token = jwt.encode(payload, private_key, algorithm="ES256", headers=headers)
-        return token
+        header = _JWT_HEADER_PREFIX + _next_nonce() + '"}'
+        header_b64 = _b64url(header.encode())
+        payload_b64 = _b64url(json.dumps(payload, separators=(",", ":")).encode())
+
+        # Hash the two segments in place rather than concatenating a signing
+        # input first. ES256 signs DER; JWS wants the raw 32-byte r || 32-byte s.
+        digest = hashlib.sha256(header_b64)
+        digest.update(b".")
+        digest.update(payload_b64)
+        der = private_key.sign(digest.digest(), ec.ECDSA(Prehashed(hashes.SHA256())))
+        r, s = decode_dss_signature(der)
+        signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+        return b".".join((header_b64, payload_b64, _b64url(signature))).decode()
     except Exception as e:
         app.logger.error(f"JWT build failed: {e}")
         app.logger.error(f"API_KEY: {COINBASE_API_KEY[:20]}...")
@@ -101,34 +185,38 @@ def _build_jwt(method: str, path: str) -> str:
 def place_market_order_jwt(side: str, contracts: int, client_order_id: str) -> dict:
     """Place market order using JWT REST API - SAME AS WORKING HFT BOT"""
     try:
-        # Get product_id from exchange
-        ex = get_exchange()
-        product_id = ex.markets[SYMBOL].get("id")
+        # Get product_id from config, or from the exchange on the first order
+        if _PRODUCT_ID is None:
+            get_exchange()
+        product_id = _PRODUCT_ID
         if not product_id:
             raise RuntimeError(f"Could not get product_id for {SYMBOL}")
         
         # Build the order payload exactly like HFT bot
         base_size = str(int(contracts))
-        oc = {"market_market_ioc": {"base_size": base_size}}
-        payload = {
-            "client_order_id": client_order_id,
-            "product_id": product_id,
-            "side": side.upper(),
-            "order_configuration": oc
-        }
+        side = _SIDE_UPPER.get(side) or side.upper()
+        if _SAFE_ORDER_FIELD.fullmatch(client_order_id) and _SAFE_ORDER_FIELD.fullmatch(product_id):
+            body = _ORDER_TMPL.format(coid=client_order_id, pid=product_id, side=side, sz=base_size).encode()
+        else:
+            oc = {"market_market_ioc": {"base_size": base_size}}
+            payload = {
+                "client_order_id": client_order_id,
+                "product_id": product_id,
+                "side": side,
+                "order_configuration": oc
+            }
+            body = json.dumps(payload, separators=(",", ":")).encode()
         
         # Make the REST API call with JWT
         path = "/api/v3/brokerage/orders"
         token = _build_jwt("POST", path)
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        headers = _ORDER_HEADERS_TEMPLATE.copy()
+        headers["Authorization"] = "Bearer " + token
         
         app.logger.info(f"🚀 JWT REST API call: POST {path}")
-        app.logger.info(f"Payload: {payload}")
+        app.logger.info(f"Payload: {body.decode()}")
         
-        r = requests.post(f"https://api.coinbase.com{path}", 
-                         headers=headers, 
-                         data=json.dumps(payload), 
-                         timeout=10)
+        r = HTTP_CLIENT.post(path, headers=headers, content=body)
         r.raise_for_status()
         resp = r.json()
         
@@ -148,7 +236,8 @@ def envcheck():
     return {
         "has_api_key": bool(COINBASE_API_KEY),
         "has_api_secret": bool(COINBASE_API_SECRET),
-        "symbol": SYMBOL
+        "symbol": SYMBOL,
+        "product_id": PRODUCT_ID or None
     }
 
 @app.get("/ccxtcheck")
@@ -184,7 +273,7 @@ def ccxtcheck():
             "best_ask": best_ask,
         }
     except Exception as e:
-        app.logger.error("ccxtcheck error: %s\n%s", e, traceback.format_exc())
+        app.logger.exception("ccxtcheck error: %s", e)
         return {"ok": False, "error": str(e)}, 500
 
 @app.post("/tv")
@@ -206,18 +295,23 @@ def tv():
     except Exception:
         return jsonify({"ok": False, "error": "invalid_json"}), 400
 
-    # Validate/normalize
-    tv_symbol = str(data.get("ticker", "")).strip()
+    # Validate/normalize. TradingView sends clean strings, so try them as-is
+    # first and only strip/lowercase when the fast check misses.
+    tv_symbol = data.get("ticker", "")
     if tv_symbol != SYMBOL:
-        return jsonify({"ok": False, "error": "bad_symbol", "got": tv_symbol, "expected": SYMBOL}), 400
+        tv_symbol = str(tv_symbol).strip()
+        if tv_symbol != SYMBOL:
+            return jsonify({"ok": False, "error": "bad_symbol", "got": tv_symbol, "expected": SYMBOL}), 400
 
-    action = str(data.get("action", "")).strip().lower()
-    if action in ("buy", "long"):
-        side = "buy"
-    elif action in ("sell", "short"):
-        side = "sell"
-    else:
-        return jsonify({"ok": False, "error": "bad_side_value", "got": action}), 400
+    action = data.get("action", "")
+    # Non-string JSON values (lists, objects) aren't hashable; send them
+    # down the slow path so they get the usual 400 instead of a 500
+    side = _ACTION_TO_SIDE.get(action) if isinstance(action, str) else None
+    if side is None:
+        action = str(action).strip().lower()
+        side = _ACTION_TO_SIDE.get(action)
+        if side is None:
+            return jsonify({"ok": False, "error": "bad_side_value", "got": action}), 400
 
     try:
         contracts = int(data.get("contracts"))
@@ -227,7 +321,7 @@ def tv():
         return jsonify({"ok": False, "error": "contracts_must_be_positive_int"}), 400
 
     base_id = str(data.get("order_id") or "tv").replace(" ", "_")
-    client_order_id = f"{base_id}-{uuid.uuid4().hex[:8]}"[:64]
+    client_order_id = f"{base_id}-{os.urandom(4).hex()}"[:64]
 
     sent = {
         "symbol": SYMBOL,
@@ -252,8 +346,7 @@ def tv():
         
     except Exception as e:
         # Enhanced error logging
-        app.logger.error(f"❌ JWT REST API Order failed: {e}")
-        app.logger.error(f"Full traceback: {traceback.format_exc()}")
+        app.logger.exception(f"❌ JWT REST API Order failed: {e}")
         
         error_info = {
             "error_type": type(e).__name__,
@@ -300,9 +393,10 @@ def spottest():
 
 @app.errorhandler(Exception)
 def handle_exception(e):
-    app.logger.error(f"Unhandled exception: {e}\n{traceback.format_exc()}")
+    app.logger.exception("Unhandled exception: %s", e)
     return jsonify({"ok": False, "error": "server_error", "message": str(e)}), 500
 
+# Local development only - production runs under gunicorn (see gunicorn.conf.py).
 if __name__ == "__main__":
     # Enable better logging for debugging
     import logging
@@ -310,6 +404,7 @@ if __name__ == "__main__":
     
     app.logger.info("🚀 Starting Render webhook server")
     app.logger.info(f"Symbol: {SYMBOL}")
+    app.logger.info(f"Product id: {PRODUCT_ID or '(resolved via ccxt)'}")
     app.logger.info(f"Dry run mode: {DRY_RUN}")
     app.logger.info(f"API key configured: {bool(COINBASE_API_KEY)}")
     app.logger.info(f"API secret configured: {bool(COINBASE_API_SECRET)}")
@@ -1,14 +1,38 @@
 import os
+import json
+import functools
+import threading
 import requests
-from datetime import datetime, time
-try:
-    import pytz
-except ImportError as e:
-    print(f"Error importing pytz: {e}")
-    raise
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date, time, timedelta, timezone
+from time import monotonic
+from zoneinfo import ZoneInfo
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel, Field, ValidationError
+# orjson is a much faster C parser/serializer for the small Alpaca payloads
+# on the webhook hot path; fall back to the stdlib if it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+
+    class _JSONProvider(DefaultJSONProvider):
+        """Serve jsonify() responses and request.get_json() through orjson."""
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+    _JSONProvider = DefaultJSONProvider
 
 app = Flask(__name__)
+app.json = _JSONProvider(app)
 
 # --- Alpaca API Configuration ---
 # Ensure these environment variables are set in your deployment environment
@@ -23,6 +47,8 @@ ENABLE_TRADING = True # Set to True for trading, False for no trades to go throu
 # --- Strategy Configuration ---
 # Set the strategy type (e.g., "long" or "short")
 STRATEGY_TYPE = os.environ.get("STRATEGY_TYPE", "long").lower()
+ENTRY_ACTION = "buy" if STRATEGY_TYPE == "long" else "sell"
+EXIT_ACTION = "sell" if STRATEGY_TYPE == "long" else "buy"
 
 # --- Market Hours Configuration ---
 # Enable market hours restrictions (True to enforce market hours, False to allow all hours)
@@ -30,11 +56,75 @@ ENFORCE_MARKET_HOURS = True
 # Minutes before market close to automatically close all positions (default: 5 minutes)
 AUTO_CLOSE_BEFORE_MINUTES = 5
 
+# Trading session boundaries (ET)
+PRE_MARKET_START = time(4, 0)    # 4:00 AM ET
+REGULAR_START = time(9, 30)      # 9:30 AM ET
+MARKET_CLOSE = time(16, 0)       # 4:00 PM ET
+# Time to start auto-closing (e.g., 3:55 PM for a 5-minute buffer)
+CLOSE_BUFFER_TIME = (datetime.combine(date.today(), MARKET_CLOSE) - timedelta(minutes=AUTO_CLOSE_BEFORE_MINUTES)).time()
+
+# Timezones resolved once rather than on every call
+ET_TZ = ZoneInfo("America/New_York")
+PT_TZ = ZoneInfo("America/Los_Angeles")
+
 HEADERS = {
     "APCA-API-KEY-ID": ALPACA_API_KEY,
     "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY
 }
 
+# (connect, read) seconds; a stalled Alpaca connection must not pin a worker thread
+REQUEST_TIMEOUT = (3.05, 10)
+
+def build_session(pool_connections=10, pool_maxsize=20, timeout=REQUEST_TIMEOUT):
+    """
+    Creates the authenticated keep-alive session used for every Alpaca call.
+    Connections are pooled across webhooks, idempotent requests are retried
+    on transient gateway errors, and every request gets a default timeout.
+    """
+    session = requests.Session()
+    # requests has no session-wide timeout; a per-call timeout= still wins
+    session.request = functools.partial(session.request, timeout=timeout)
+    session.headers.update(HEADERS)
+    retries = Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504],
+                    raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          max_retries=retries)
+    session.mount("https://", adapter)
+    return session
+
+# Helpers look this up at call time, so tests can swap in their own session
+SESSION = build_session()
+
+JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
+# Extended-hours limit order used by close_position(); symbol, qty, side and
+# limit_price are filled in per call
+LIMIT_CLOSE_ORDER_TEMPLATE = {
+    "symbol": None,
+    "qty": 0,
+    "side": None,
+    "type": "limit",
+    "limit_price": None,
+    "time_in_force": "day",
+    "extended_hours": True
+}
+
+# Market open/closed only flips twice a day, so /v2/clock is cached briefly
+CLOCK_CACHE_TTL = 30  # seconds
+_CLOCK_CACHE = {"exp": 0.0, "open": False}
+_CLOCK_LOCK = threading.Lock()
+
+# Worker threads for issuing independent Alpaca REST calls concurrently
+PREFLIGHT_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="alpaca-preflight")
+
+# TradingView can fire the same alert twice in quick succession; entries per
+# symbol are deduplicated in-process, which is why gunicorn.conf.py runs a
+# single worker. symbol -> monotonic time the last entry attempt finished
+# (inf while one is in flight).
+ENTRY_DEDUP_SECONDS = 2.0
+IN_FLIGHT = {}
+IN_FLIGHT_LOCK = threading.Lock()
+
 # --- Helper Functions ---
 
 def get_position_qty(symbol):
@@ -43,9 +133,9 @@ def get_position_qty(symbol):
     Returns 0 if no position exists.
     """
     try:
-        response = requests.get(f"{BASE_URL}/v2/positions/{symbol}", headers=HEADERS)
+        response = SESSION.get(f"{BASE_URL}/v2/positions/{symbol}")
         response.raise_for_status()
-        return int(response.json()["qty"])
+        return int(_json_loads(response.content)["qty"])
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
             return 0
@@ -58,9 +148,9 @@ def get_buying_power():
     Retrieves the total account 'equity' (cash + market value of positions)
     for calculating 10% allocation based on total account value.
     """
-    account_response = requests.get(f"{BASE_URL}/v2/account", headers=HEADERS)
+    account_response = SESSION.get(f"{BASE_URL}/v2/account")
     account_response.raise_for_status()
-    account_data = account_response.json()
+    account_data = _json_loads(account_response.content)
     
     total_equity = float(account_data["equity"])
     available_buying_power = float(account_data["regt_buying_power"])
@@ -76,16 +166,49 @@ def get_buying_power():
     
     return desired_allocation
 
+def size_order(allocation, price):
+    """Number of whole shares that `allocation` dollars buys at `price`."""
+    return int(allocation // price)
+
 def is_market_open():
-    """Checks if the market is currently open."""
-    clock_response = requests.get(f"{BASE_URL}/v2/clock", headers=HEADERS)
-    clock_response.raise_for_status()
-    return clock_response.json()["is_open"]
+    """
+    Checks if the market is currently open.
+    The answer is cached for CLOCK_CACHE_TTL seconds, and never past the
+    next open/close transition reported by Alpaca.
+    """
+    # Fast path without the lock; dict reads are atomic
+    if monotonic() < _CLOCK_CACHE["exp"]:
+        return _CLOCK_CACHE["open"]
+
+    # Only one thread refreshes; concurrent callers wait and reuse its answer
+    with _CLOCK_LOCK:
+        now = monotonic()
+        if now < _CLOCK_CACHE["exp"]:
+            return _CLOCK_CACHE["open"]
+
+        clock_response = SESSION.get(f"{BASE_URL}/v2/clock")
+        clock_response.raise_for_status()
+        clock = _json_loads(clock_response.content)
+        market_open = clock["is_open"]
+
+        ttl = CLOCK_CACHE_TTL
+        transition = clock.get("next_close" if market_open else "next_open")
+        if transition:
+            try:
+                seconds_left = (datetime.fromisoformat(transition) - datetime.now(timezone.utc)).total_seconds()
+                ttl = max(0.0, min(ttl, seconds_left))
+            except ValueError:
+                pass
+
+        # Publish the value before the expiry so lock-free readers never
+        # pair a fresh expiry with a stale value
+        _CLOCK_CACHE["open"] = market_open
+        _CLOCK_CACHE["exp"] = now + ttl
+        return market_open
 
 def get_current_et_time():
     """Get current time in Eastern Time"""
-    et_tz = pytz.timezone('US/Eastern')
-    return datetime.now(et_tz)
+    return datetime.now(ET_TZ)
 
 def is_within_trading_hours():
     """
@@ -105,17 +228,12 @@ def is_within_trading_hours():
     if current_weekday > 4:  # Weekend
         return False
     
-    # Define trading hours
-    pre_market_start = time(4, 0)    # 4:00 AM ET
-    regular_start = time(9, 30)      # 9:30 AM ET  
-    regular_end = time(16, 0)        # 4:00 PM ET
-    
     # Check if within pre-market (4:00 AM - 9:30 AM ET)
-    if pre_market_start <= current_time < regular_start:
+    if PRE_MARKET_START <= current_time < REGULAR_START:
         return True
     
     # Check if within regular market hours (9:30 AM - 4:00 PM ET)
-    if regular_start <= current_time < regular_end:
+    if REGULAR_START <= current_time < MARKET_CLOSE:
         return True
     
     return False
@@ -128,32 +246,16 @@ def is_near_market_close():
         return False
     
     current_et = get_current_et_time()
-    current_time = current_et.time()
-    current_weekday = current_et.weekday()
-    
-    # Only check on weekdays
-    if current_weekday > 4:
-        return False
-    
-    # Market closes at 4:00 PM ET
-    market_close = time(16, 0)
-    # Calculate the time to start closing (e.g., 3:55 PM for 5-minute buffer)
-    close_hour = 15 if AUTO_CLOSE_BEFORE_MINUTES >= 60 else 16
-    close_minute = (60 - AUTO_CLOSE_BEFORE_MINUTES) if AUTO_CLOSE_BEFORE_MINUTES < 60 else (60 - (AUTO_CLOSE_BEFORE_MINUTES - 60))
-    close_buffer_time = time(close_hour, close_minute)
     
-    # If it's past the buffer time but before market close
-    if close_buffer_time <= current_time < market_close:
-        return True
-    
-    return False
+    # Only check on weekdays, between the buffer time and market close
+    return current_et.weekday() <= 4 and CLOSE_BUFFER_TIME <= current_et.time() < MARKET_CLOSE
 
 def get_all_positions():
     """Get all open positions"""
     try:
-        response = requests.get(f"{BASE_URL}/v2/positions", headers=HEADERS)
+        response = SESSION.get(f"{BASE_URL}/v2/positions")
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except requests.exceptions.HTTPError as e:
         print(f"Error fetching positions: {e.response.text}")
         return []
@@ -168,51 +270,61 @@ def close_all_positions():
     
     print(f"AUTO-CLOSE: Closing {len(positions)} positions before market close")
     
+    # Issue every DELETE (a market close) concurrently so N positions take
+    # about one round-trip instead of N. max_workers stays within the
+    # session's pool_maxsize so threads never wait on a free connection.
     success_count = 0
-    for position in positions:
-        try:
-            symbol = position['symbol']
-            # Use market order to close quickly
-            close_url = f"{BASE_URL}/v2/positions/{symbol}"
-            response = requests.delete(close_url, headers=HEADERS)
-            response.raise_for_status()
-            print(f"AUTO-CLOSE: Closed position for {symbol}")
-            success_count += 1
-        except Exception as e:
-            print(f"AUTO-CLOSE ERROR: Failed to close {symbol}: {e}")
+    with ThreadPoolExecutor(max_workers=min(16, len(positions))) as executor:
+        futures = {
+            executor.submit(SESSION.delete, f"{BASE_URL}/v2/positions/{position['symbol']}"): position['symbol']
+            for position in positions
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                future.result().raise_for_status()
+                print(f"AUTO-CLOSE: Closed position for {symbol}")
+                success_count += 1
+            except Exception as e:
+                print(f"AUTO-CLOSE ERROR: Failed to close {symbol}: {e}")
     
     return success_count == len(positions)
 
-def close_position(symbol, alert_price_str, market_is_open, strategy_type):
+def close_position(symbol, alert_price, market_is_open, strategy_type):
     """
     Closes the entire position for a given symbol.
     - Uses a market order during regular hours for a prompt exit.
     - Uses a limit order during extended hours to ensure the order can be placed.
     """
-    qty_to_close = get_position_qty(symbol)
-    if qty_to_close == 0:
-        msg = f"No open position for {symbol} to close."
-        print(msg)
-        return jsonify({"message": msg}), 200
+    no_position_msg = f"No open position for {symbol} to close."
 
     if market_is_open:
         # During market hours, a market order is fast and reliable.
-        # The DELETE endpoint liquidates the position using a market order.
+        # The DELETE endpoint liquidates the position using a market order,
+        # and answers 404 when there is nothing to close, so no separate
+        # position lookup is needed.
         close_position_url = f"{BASE_URL}/v2/positions/{symbol}"
         try:
-            response = requests.delete(close_position_url, headers=HEADERS)
+            response = SESSION.delete(close_position_url)
+            if response.status_code == 404:
+                print(no_position_msg)
+                return jsonify({"message": no_position_msg}), 200
             response.raise_for_status()
             print(f"Market close order for {symbol} submitted successfully.")
-            return jsonify({"message": "Market close order submitted", "data": response.json()}), response.status_code
+            return jsonify({"message": "Market close order submitted", "data": _json_loads(response.content)}), response.status_code
         except requests.exceptions.HTTPError as e:
             print(f"Error closing position {symbol}: {e.response.text}")
             return jsonify({"error": f"Failed to close position: {e.response.text}"}), e.response.status_code
     else:
         # During extended hours, a market order will likely fail.
-        # We must use a limit order with the 'extended_hours' flag.
+        # We must use a limit order with the 'extended_hours' flag,
+        # which needs the exact quantity to close.
+        qty_to_close = get_position_qty(symbol)
+        if qty_to_close == 0:
+            print(no_position_msg)
+            return jsonify({"message": no_position_msg}), 200
+
         try:
-            alert_price = float(alert_price_str)
-            
             # The side for closing depends on the strategy type
             # If long, exit_action is 'sell'. If short, exit_action is 'buy'.
             exit_side = "sell" if strategy_type == "long" else "buy"
@@ -220,31 +332,103 @@ def close_position(symbol, alert_price_str, market_is_open, strategy_type):
             # Use the alert price as the limit price for the order.
             # For a sell limit, you want to sell at or above this price.
             # For a buy limit (to cover short), you want to buy at or below this price.
-            limit_price = round(alert_price, 2)
-
-            order_data = {
-                "symbol": symbol,
-                "qty": qty_to_close,
-                "side": exit_side,  # Dynamically set 'buy' or 'sell' to close position
-                "type": "limit",
-                "limit_price": str(limit_price),
-                "time_in_force": "day",  # Good 'Til Canceled, so the order persists until filled or cancelled
-                "extended_hours": True
-            }
-
-            order_response = requests.post(f"{BASE_URL}/v2/orders", json=order_data, headers=HEADERS)
+            order_data = LIMIT_CLOSE_ORDER_TEMPLATE.copy()
+            order_data["symbol"] = symbol
+            order_data["qty"] = qty_to_close
+            order_data["side"] = exit_side  # Dynamically set 'buy' or 'sell' to close position
+            order_data["limit_price"] = f"{alert_price:.2f}"
+
+            order_response = SESSION.post(f"{BASE_URL}/v2/orders", data=_json_dumps(order_data),
+                                          headers=JSON_CONTENT_TYPE)
             order_response.raise_for_status()
             print(f"Limit close order ({exit_side}) for {symbol} placed successfully for extended hours.")
-            return jsonify({"message": "Limit close order submitted", "data": order_response.json()}), order_response.status_code
-        except (ValueError, TypeError):
-            return jsonify({"error": f"Invalid price format received for closing order: {alert_price_str}"}), 400
+            return jsonify({"message": "Limit close order submitted", "data": _json_loads(order_response.content)}), order_response.status_code
         except requests.exceptions.HTTPError as e:
             print(f"Error placing limit close order: {e.response.text}")
             return jsonify({"error": f"Failed to place limit close order: {e.response.text}"}), e.response.status_code
 
 
+def open_position(symbol, alert_price):
+    """
+    Opens a new position for the strategy's entry side.
+    - Skips the entry if a position already exists.
+    - Sizes the order from buying_power (10% of equity).
+    - Uses a market order during regular hours, a limit order in extended hours.
+    """
+    # The clock, position and account lookups are independent, so issue
+    # them concurrently: one round-trip of wall time instead of three.
+    market_future = PREFLIGHT_POOL.submit(is_market_open)
+    position_future = PREFLIGHT_POOL.submit(get_position_qty, symbol)
+    buying_power_future = PREFLIGHT_POOL.submit(get_buying_power)
+
+    market_is_open = market_future.result()
+    if position_future.result() > 0:
+        msg = f"Position already exists for {symbol}, skipping new entry order."
+        print(msg)
+        return jsonify({"message": msg}), 200
+
+    try:
+        # --- 1. Calculate Trade Size (10% of Total Account Equity) ---
+        buying_power = buying_power_future.result()
+
+        if alert_price <= 0:
+            return jsonify({"error": "Invalid price received from alert."}), 400
+
+        trade_allocation = buying_power  # buying_power now returns 10% of equity
+        qty = size_order(trade_allocation, alert_price)
+
+        if qty < 1:
+            msg = f"Not enough available funds for one share at ${alert_price:.2f} with 10% equity allocation."
+            print(msg)
+            return jsonify({"message": msg}), 200
+
+        # --- 2. Determine Order Type (Market vs. Limit) ---
+        order_data = {
+            "symbol": symbol,
+            "qty": qty,
+            "side": ENTRY_ACTION,
+            "time_in_force": "day",
+        }
+
+        if market_is_open:
+            print("Market is open. Placing a MARKET order.")
+            order_data["type"] = "market"
+        else:
+            print("Market is closed. Placing a LIMIT order for extended hours.")
+            # For both buy and sell limit orders, use the alert price directly.
+            # This ensures the order attempts to fill at the price the alert was triggered.
+            limit_price = round(alert_price, 2)
+
+            order_data["type"] = "limit"
+            order_data["limit_price"] = str(limit_price)
+            order_data["extended_hours"] = True
+            # For extended hours, 'day' time_in_force might not be ideal.
+            # Using 'gtc' (Good 'Til Canceled) ensures the order persists.
+            order_data["time_in_force"] = "day"  
+
+    except Exception as e:
+        print(f"An unexpected error occurred during order preparation: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    # --- 3. Submit the Order ---
+    try:
+        order_response = SESSION.post(f"{BASE_URL}/v2/orders", json=order_data)
+        order_response.raise_for_status()
+        print(f"Order ({order_data['type']}) for {qty} shares of {symbol} placed successfully.")
+        return jsonify({"message": "Order placed", "data": _json_loads(order_response.content)}), order_response.status_code
+    except requests.exceptions.HTTPError as e:
+        print(f"Error placing entry order: {e.response.text}")
+        return jsonify({"error": f"Failed to place entry order: {e.response.text}"}), e.response.status_code
+
+
 # --- Webhook Endpoint ---
 
+class Alert(BaseModel):
+    """TradingView alert payload; price may arrive as a number or a numeric string."""
+    ticker: str = Field(min_length=1)
+    action: str = Field(min_length=1)
+    price: float = Field(allow_inf_nan=False)
+
 @app.route("/webhook", methods=["POST"])
 def webhook():
     """
@@ -254,15 +438,20 @@ def webhook():
     - Places LIMIT orders during extended hours.
     - Enforces market hours restrictions if enabled.
     """
-    data = request.get_json()
-    print(f"Received alert for '{STRATEGY_TYPE}' strategy: {data}")
+    # Parse and validate the raw body in one pass
+    try:
+        alert = Alert.model_validate_json(request.get_data(cache=False))
+    except ValidationError:
+        return jsonify({"error": "Invalid payload, missing ticker, action, or price"}), 400
+    print(f"Received alert for '{STRATEGY_TYPE}' strategy: {alert}")
 
-    symbol = data.get("ticker")
-    action = data.get("action")
-    alert_price_str = data.get("price")
+    symbol = alert.ticker
+    action = alert.action
+    alert_price = alert.price
 
-    if not all([symbol, action, alert_price_str]):
-        return jsonify({"error": "Invalid payload, missing ticker, action, or price"}), 400
+    # Drop alerts this strategy doesn't act on before any Alpaca call is made
+    if action not in (ENTRY_ACTION, EXIT_ACTION):
+        return jsonify({"message": f"Action '{action}' does not match expected actions for '{STRATEGY_TYPE}' strategy."}), 200
     
     # Check the ENABLE_TRADING flag
     if not ENABLE_TRADING:
@@ -286,80 +475,28 @@ def webhook():
         print(msg)
         return jsonify({"message": msg, "blocked_time": current_et.isoformat()}), 200
         
-    # Check market status once for the whole request
-    market_is_open = is_market_open()
-
-    entry_action = "buy" if STRATEGY_TYPE == "long" else "sell"
-    exit_action = "sell" if STRATEGY_TYPE == "long" else "buy"
-
-    if action == exit_action:
+    if action == EXIT_ACTION:
+        # Market status decides between a market and an extended-hours limit close
+        market_is_open = is_market_open()
         # Call the updated close_position function with the market status and alert price
         # Pass STRATEGY_TYPE to close_position to determine the correct exit side ('buy' for short, 'sell' for long)
-        return close_position(symbol, alert_price_str, market_is_open, STRATEGY_TYPE)
-
-    elif action == entry_action:
-        if get_position_qty(symbol) > 0:
-            msg = f"Position already exists for {symbol}, skipping new entry order."
-            print(msg)
-            return jsonify({"message": msg}), 200
-
-        try:
-            # --- 1. Calculate Trade Size (10% of Total Account Equity) ---
-            buying_power = get_buying_power()
-            alert_price = float(alert_price_str)
-            
-            if alert_price <= 0:
-                return jsonify({"error": "Invalid price received from alert."}), 400
-
-            trade_allocation = buying_power  # buying_power now returns 10% of equity
-            qty = int(trade_allocation // alert_price)
-
-            if qty < 1:
-                msg = f"Not enough available funds for one share at ${alert_price:.2f} with 10% equity allocation."
+        return close_position(symbol, alert_price, market_is_open, STRATEGY_TYPE)
+
+    else:  # action == ENTRY_ACTION
+        # Duplicate alerts often land before Alpaca shows the first entry as a
+        # position, so only one entry per symbol may be in flight, and repeats
+        # are dropped for ENTRY_DEDUP_SECONDS after it completes.
+        with IN_FLIGHT_LOCK:
+            if monotonic() - IN_FLIGHT.get(symbol, float("-inf")) < ENTRY_DEDUP_SECONDS:
+                msg = f"Duplicate entry alert for {symbol} suppressed."
                 print(msg)
                 return jsonify({"message": msg}), 200
-
-            # --- 2. Determine Order Type (Market vs. Limit) ---
-            order_data = {
-                "symbol": symbol,
-                "qty": qty,
-                "side": entry_action,
-                "time_in_force": "day",
-            }
-
-            if market_is_open:
-                print("Market is open. Placing a MARKET order.")
-                order_data["type"] = "market"
-            else:
-                print("Market is closed. Placing a LIMIT order for extended hours.")
-                # For both buy and sell limit orders, use the alert price directly.
-                # This ensures the order attempts to fill at the price the alert was triggered.
-                limit_price = round(alert_price, 2)
-                
-                order_data["type"] = "limit"
-                order_data["limit_price"] = str(limit_price)
-                order_data["extended_hours"] = True
-                # For extended hours, 'day' time_in_force might not be ideal.
-                # Using 'gtc' (Good 'Til Canceled) ensures the order persists.
-                order_data["time_in_force"] = "day"  
-
-        except (ValueError, TypeError):
-            return jsonify({"error": f"Invalid price format received: {alert_price_str}"}), 400
-        except Exception as e:
-            print(f"An unexpected error occurred during order preparation: {e}")
-            return jsonify({"error": str(e)}), 500
-
-        # --- 3. Submit the Order ---
+            IN_FLIGHT[symbol] = float("inf")  # in flight: always suppress
         try:
-            order_response = requests.post(f"{BASE_URL}/v2/orders", json=order_data, headers=HEADERS)
-            order_response.raise_for_status()
-            print(f"Order ({order_data['type']}) for {qty} shares of {symbol} placed successfully.")
-            return jsonify({"message": "Order placed", "data": order_response.json()}), order_response.status_code
-        except requests.exceptions.HTTPError as e:
-            print(f"Error placing entry order: {e.response.text}")
-            return jsonify({"error": f"Failed to place entry order: {e.response.text}"}), e.response.status_code
-
-    return jsonify({"message": f"Action '{action}' does not match expected actions for '{STRATEGY_TYPE}' strategy."}), 200
+            return open_position(symbol, alert_price)
+        finally:
+            with IN_FLIGHT_LOCK:
+                IN_FLIGHT[symbol] = monotonic()
 
 # --- Status Endpoint ---
 
@@ -368,13 +505,17 @@ def status():
     """
     Returns current market hours status and trading configuration
     """
+    # The clock and positions lookups are independent; fetch them together
+    market_future = PREFLIGHT_POOL.submit(is_market_open)
+    positions_future = PREFLIGHT_POOL.submit(get_all_positions)
+
     current_et = get_current_et_time()
     within_hours = is_within_trading_hours()
     near_close = is_near_market_close()
-    market_open = is_market_open()
+    market_open = market_future.result()
     
     # Get position count
-    positions = get_all_positions()
+    positions = positions_future.result()
     position_count = len(positions)
     
     status_info = {
@@ -407,8 +548,7 @@ def status():
     }
     
     # Add timezone conversion for Pacific Time users
-    pt_tz = pytz.timezone('US/Pacific')
-    current_pt = current_et.astimezone(pt_tz)
+    current_pt = current_et.astimezone(PT_TZ)
     status_info["current_time"]["pacific"] = current_pt.strftime("%Y-%m-%d %I:%M:%S %p PT")
     status_info["trading_hours"]["pacific_equivalent"] = {
         "pre_market": "1:00 AM - 6:30 AM PT",
@@ -418,6 +558,7 @@ def status():
     return jsonify(status_info), 200
 
 # --- Main Application Runner ---
+# Local development only - production runs under gunicorn (see gunicorn.conf.py).
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
@@ -1,6 +1,6 @@
-import os, asyncio, httpx
-from datetime import datetime, timezone, date
-from typing import Optional, Literal, Dict, List, Any
+import os, time, asyncio, threading, httpx, orjson
+from datetime import datetime, timedelta, date
+from typing import Optional, Literal, Dict, List, Tuple, Any
 from zoneinfo import ZoneInfo
 
 from fastapi import FastAPI, HTTPException
@@ -40,12 +40,32 @@ HEADERS = {
 LOCAL_TZ  = ZoneInfo("America/Los_Angeles")
 EOD_HHMM  = os.getenv("EOD_FLATTEN_HHMM", "13:00")  # 13:00 PT by default
 EOD_ON    = os.getenv("EOD_ENABLED", "true").lower() == "true"
+try:
+    _eod = datetime.strptime(EOD_HHMM.strip(), "%H:%M")
+except ValueError:
+    # Don't take the whole app down over a malformed cutoff
+    print(f"WARNING: EOD_FLATTEN_HHMM={EOD_HHMM!r} is not HH:MM; using 13:00")
+    EOD_HHMM, _eod = "13:00", datetime.strptime("13:00", "%H:%M")
+EOD_HOUR, EOD_MINUTE = _eod.hour, _eod.minute
 
 # Track OCO children: parent entry id -> {tp_id, sl_id}
 OCO_BOOK: Dict[str, Dict[str, Optional[str]]] = {}
+# Reverse index: child order id -> (parent entry id, "tp_id" | "sl_id")
+CHILD_TO_PARENT: Dict[str, Tuple[str, str]] = {}
+# Both maps are touched from the API loop and the stream thread
+OCO_LOCK = threading.Lock()
+# Entry orders awaiting a fill: order id -> (waiter's event loop, future)
+PENDING_FILLS: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
 STREAM_RUNNING = False
+
+# Option contract listings per query: sorted query params (underlying, type,
+# expiry or expiration_date_gte, strike window) -> (fetched_at, [(expiry, contract), ...]).
+# One entry per distinct strike/expiry requested, so stale entries and idle
+# locks are pruned whenever a new listing is stored.
+CONTRACTS_CACHE_TTL = 600  # seconds
+_CONTRACTS_CACHE: Dict[Tuple, Tuple[float, List[Tuple[date, Dict[str, Any]]]]] = {}
+_CONTRACTS_LOCKS: Dict[Tuple, asyncio.Lock] = {}
 EOD_THREAD_STARTED = False
-_eod_last_run_date = None
 
 app = FastAPI(title="VWAP Options Trader", version="1.4")
 
@@ -81,115 +101,181 @@ class SimpleTrade(BaseModel):
 # =========================
 # Helpers (ATM selection + OCO exits)
 # =========================
-async def get_underlying_price(underlying: str) -> float:
+async def get_underlying_price(client: httpx.AsyncClient, underlying: str) -> float:
     """
     Fetch latest underlying price from Alpaca market data.
     Prefer latest quote ask; fall back to latest trade or bar if needed.
+    All three are requested at once so a fallback costs no extra round-trip.
     """
-    async with httpx.AsyncClient(timeout=15) as client:
-        # Try latest QUOTE first
-        try:
-            q_url = f"{DATA_STOCKS_BASE}/stocks/{underlying.upper()}/quotes/latest"
-            qr = await client.get(q_url, headers=HEADERS, params={"feed": ALPACA_FEED})
-            if qr.status_code == 200:
-                q = qr.json().get("quote") or {}
-                ap = q.get("ap") or q.get("bp")
-                if ap is not None:
-                    return float(ap)
-        except Exception:
-            pass
+    base = f"{DATA_STOCKS_BASE}/stocks/{underlying.upper()}"
+    params = {"feed": ALPACA_FEED}
+    qr, tr, br = await asyncio.gather(
+        client.get(f"{base}/quotes/latest", params=params),
+        client.get(f"{base}/trades/latest", params=params),
+        client.get(f"{base}/bars/latest", params=params),
+        return_exceptions=True,
+    )
+    # A failed request comes back as its exception, which has no status_code
+    # and is skipped by the except clauses below
 
-        # Fall back to latest TRADE
-        try:
-            t_url = f"{DATA_STOCKS_BASE}/stocks/{underlying.upper()}/trades/latest"
-            tr = await client.get(t_url, headers=HEADERS, params={"feed": ALPACA_FEED})
-            if tr.status_code == 200:
-                px = (tr.json().get("trade") or {}).get("p")
-                if px is not None:
-                    return float(px)
-        except Exception:
-            pass
+    # Try latest QUOTE first
+    try:
+        if qr.status_code == 200:
+            q = orjson.loads(qr.content).get("quote") or {}
+            ap = q.get("ap") or q.get("bp")
+            if ap is not None:
+                return float(ap)
+    except Exception:
+        pass
 
-        # Fall back to latest BAR (close)
-        try:
-            b_url = f"{DATA_STOCKS_BASE}/stocks/{underlying.upper()}/bars/latest"
-            br = await client.get(b_url, headers=HEADERS, params={"feed": ALPACA_FEED})
-            if br.status_code == 200:
-                c = (br.json().get("bar") or {}).get("c")
-                if c is not None:
-                    return float(c)
-        except Exception:
-            pass
+    # Fall back to latest TRADE
+    try:
+        if tr.status_code == 200:
+            px = (orjson.loads(tr.content).get("trade") or {}).get("p")
+            if px is not None:
+                return float(px)
+    except Exception:
+        pass
+
+    # Fall back to latest BAR (close)
+    try:
+        if br.status_code == 200:
+            c = (orjson.loads(br.content).get("bar") or {}).get("c")
+            if c is not None:
+                return float(c)
+    except Exception:
+        pass
 
     raise HTTPException(status_code=502, detail="Unable to fetch underlying price from market data.")
 
 
-async def choose_contract_symbol(underlying: str, expiry: Optional[str], is_call: bool,
-                                 strike: Optional[float], _target_delta_unused: float) -> str:
+async def get_option_contracts(client: httpx.AsyncClient, underlying: str, typ: str,
+                               expiry: Optional[str] = None,
+                               strike: Optional[float] = None) -> List[Tuple[date, Dict[str, Any]]]:
     """
-    ATM selection:
-      1) Pull contracts via /v2/options/contracts?underlying_symbols=<UND>
-      2) Choose nearest expiration date >= today (or the provided expiry)
-      3) Filter by type (call/put)
-      4) If 'strike' provided, pick exact strike; otherwise pick ATM (closest strike to current ask)
+    Option contracts for an underlying as (expiration date, contract) pairs.
+    Type, expiry and strike are filtered server-side so only matching
+    contracts come over the wire. Listings barely change intraday, so each
+    query is cached for CONTRACTS_CACHE_TTL seconds.
     """
-    # 1) Pull contracts
-    url = f"{ALPACA_REST_BASE}/v2/options/contracts"
     params = {
         "underlying_symbols": underlying.upper(),
+        "type": typ,
         "limit": 1000
     }
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url, headers=HEADERS, params=params)
+    if expiry:
+        params["expiration_date"] = expiry
+    else:
+        params["expiration_date_gte"] = date.today().isoformat()
+    if strike is not None:
+        params["strike_price_gte"] = f"{float(strike) - 0.001:.3f}"
+        params["strike_price_lte"] = f"{float(strike) + 0.001:.3f}"
+
+    key = tuple(sorted(params.items()))
+    lock = _CONTRACTS_LOCKS.setdefault(key, asyncio.Lock())
+    async with lock:
+        now = time.monotonic()
+        cached = _CONTRACTS_CACHE.get(key)
+        if cached and now - cached[0] < CONTRACTS_CACHE_TTL:
+            return cached[1]
+
+        url = f"{ALPACA_REST_BASE}/v2/options/contracts"
+        r = await client.get(url, params=params, timeout=20)
         r.raise_for_status()
-        data = r.json()
-
-    contracts = data.get("option_contracts", [])
+        contracts = [(date.fromisoformat(c["expiration_date"]), c)
+                     for c in orjson.loads(r.content).get("option_contracts", [])]
+        if contracts:
+            _prune_contracts_cache(now)
+            _CONTRACTS_CACHE[key] = (now, contracts)
+        return contracts
+
+
+def _prune_contracts_cache(now: float):
+    """Drop expired listings, and the locks of queries nobody is fetching."""
+    for key in [k for k, (fetched_at, _) in _CONTRACTS_CACHE.items()
+                if now - fetched_at >= CONTRACTS_CACHE_TTL]:
+        del _CONTRACTS_CACHE[key]
+    for key in [k for k, lock in _CONTRACTS_LOCKS.items()
+                if k not in _CONTRACTS_CACHE and not lock.locked()]:
+        del _CONTRACTS_LOCKS[key]
+
+
+async def choose_contract_symbol(client: httpx.AsyncClient, underlying: str, expiry: Optional[str],
+                                 is_call: bool, strike: Optional[float], _target_delta_unused: float) -> str:
+    """
+    ATM selection:
+      1) Pull contracts via /v2/options/contracts, filtered server-side by
+         type (call/put), expiry (or >= today) and strike if provided
+      2) Choose the provided expiry, or the nearest expiration date
+      3) If 'strike' provided, it is the only strike returned; otherwise pick ATM (closest strike to current ask)
+    """
+    # 1) Pull matching contracts (cached per query)
+    typ = "call" if is_call else "put"
+    contracts = await get_option_contracts(client, underlying, typ, expiry, strike)
     if not contracts:
-        raise HTTPException(status_code=404, detail="No option contracts returned for underlying.")
+        if strike is not None:
+            raise HTTPException(status_code=404, detail=f"Requested strike {strike} not found.")
+        if expiry:
+            raise HTTPException(status_code=404, detail=f"No {typ} contracts for requested expiry {expiry}.")
+        raise HTTPException(status_code=404, detail=f"No {typ} contracts returned for underlying.")
 
     # 2) Choose expiration
-    today = date.today()
-    # keep only expiries >= today
-    contracts = [c for c in contracts if date.fromisoformat(c["expiration_date"]) >= today]
+    nearest_exp = min(exp for exp, _ in contracts)
+    expiry_contracts = [c for exp, c in contracts if exp == nearest_exp]
 
-    if expiry:
-        expiry_contracts = [c for c in contracts if c["expiration_date"] == expiry]
-        if not expiry_contracts:
-            raise HTTPException(status_code=404, detail=f"No contracts for requested expiry {expiry}.")
-    else:
-        contracts.sort(key=lambda c: c["expiration_date"])
-        nearest_exp = contracts[0]["expiration_date"]
-        expiry_contracts = [c for c in contracts if c["expiration_date"] == nearest_exp]
-
-    # 3) Filter by type
-    typ = "call" if is_call else "put"
-    expiry_contracts = [c for c in expiry_contracts if (c.get("type") == typ)]
-    if not expiry_contracts:
-        raise HTTPException(status_code=404, detail=f"No {typ} contracts at chosen expiry.")
-
-    # 4) Strike selection
+    # 3) Strike selection
     if strike is not None:
-        for c in expiry_contracts:
-            if abs(float(c["strike_price"]) - float(strike)) < 1e-6:
-                return c["symbol"]
-        raise HTTPException(status_code=404, detail=f"Requested strike {strike} not found at chosen expiry.")
+        return expiry_contracts[0]["symbol"]
 
     # ATM = strike closest to spot
-    spot = await get_underlying_price(underlying)
+    spot = await get_underlying_price(client, underlying)
     expiry_contracts.sort(key=lambda c: abs(float(c["strike_price"]) - spot))
     return expiry_contracts[0]["symbol"]
 
-async def wait_for_fill(order_id: str, poll_sec: float = 0.5, timeout_sec: float = 90.0) -> float:
-    deadline = datetime.now(timezone.utc).timestamp() + timeout_sec
-    while datetime.now(timezone.utc).timestamp() < deadline:
-        o = trading.get_order_by_id(order_id)
-        if o.filled_qty and float(o.filled_qty) >= float(o.qty):
-            return float(o.filled_avg_price or o.limit_price or o.stop_price)
-        if o.status in ("canceled", "rejected", "expired"):
-            raise HTTPException(status_code=409, detail=f"Entry order {o.status}")
-        await asyncio.sleep(poll_sec)
-    raise HTTPException(status_code=504, detail="Entry fill timeout")
+def _order_filled_price(o) -> Optional[float]:
+    """Average fill price if the order is completely filled, else None."""
+    if o.filled_qty and float(o.filled_qty) >= float(o.qty):
+        return float(o.filled_avg_price or o.limit_price or o.stop_price)
+    return None
+
+def _settle_fill(fut: asyncio.Future, price: Optional[float], exc: Optional[Exception]):
+    if fut.done():
+        return
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(price)
+
+async def wait_for_fill(order_id: str, poll_sec: float = 10.0, timeout_sec: float = 90.0) -> float:
+    """
+    Wait for an entry order to fill completely and return its average price.
+    Fills are pushed by the trade-updates stream via PENDING_FILLS; a REST
+    poll is kept as a fallback in case an update is missed or arrived before
+    we started listening. The poll starts fast and backs off exponentially
+    up to poll_sec.
+    """
+    key = str(order_id)
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    PENDING_FILLS[key] = (loop, fut)
+    try:
+        deadline = loop.time() + timeout_sec
+        wait = min(0.5, poll_sec)
+        while loop.time() < deadline:
+            o = await asyncio.to_thread(trading.get_order_by_id, order_id)
+            price = _order_filled_price(o)
+            if price is not None:
+                return price
+            if o.status in ("canceled", "rejected", "expired"):
+                raise HTTPException(status_code=409, detail=f"Entry order {o.status}")
+            remaining = deadline - loop.time()
+            try:
+                return await asyncio.wait_for(asyncio.shield(fut), timeout=max(0.0, min(wait, remaining)))
+            except asyncio.TimeoutError:
+                wait = min(wait * 2, poll_sec)
+        raise HTTPException(status_code=504, detail="Entry fill timeout")
+    finally:
+        PENDING_FILLS.pop(key, None)
 
 async def place_oco_children(symbol: str, qty: int, entry_avg: float,
                              tp_pct: float, sl_pct: float, parent_id: str):
@@ -204,13 +290,37 @@ async def place_oco_children(symbol: str, qty: int, entry_avg: float,
 
     tp_req = LimitOrderRequest(symbol=symbol, qty=qty, side=OrderSide.SELL,
                                time_in_force=TimeInForce.DAY, limit_price=tp_px)
-    tp = trading.submit_order(tp_req)
-
     sl_req = StopOrderRequest(symbol=symbol, qty=qty, side=OrderSide.SELL,
                               time_in_force=TimeInForce.DAY, stop_price=sl_px)
-    sl = trading.submit_order(sl_req)
 
-    OCO_BOOK[parent_id] = {"tp_id": tp.id, "sl_id": sl.id}
+    # Submit both legs at once so neither is live alone for a full round-trip
+    tp, sl = await asyncio.gather(
+        asyncio.to_thread(trading.submit_order, tp_req),
+        asyncio.to_thread(trading.submit_order, sl_req),
+        return_exceptions=True,
+    )
+
+    # If one leg failed, cancel the other rather than leave half an OCO working
+    failed = [leg for leg in (tp, sl) if isinstance(leg, BaseException)]
+    if failed:
+        for leg in (tp, sl):
+            if not isinstance(leg, BaseException):
+                try: await asyncio.to_thread(trading.cancel_order_by_id, leg.id)
+                except Exception: pass
+        raise failed[0]
+
+    with OCO_LOCK:
+        OCO_BOOK[parent_id] = {"tp_id": tp.id, "sl_id": sl.id}
+        CHILD_TO_PARENT[str(tp.id)] = (parent_id, "tp_id")
+        CHILD_TO_PARENT[str(sl.id)] = (parent_id, "sl_id")
+
+def _pop_oco(parent) -> Dict[str, Optional[str]]:
+    """Drop a parent's OCO record and its reverse-index entries. Caller holds OCO_LOCK."""
+    kids = OCO_BOOK.pop(parent, None) or {}
+    for kid in kids.values():
+        if kid:
+            CHILD_TO_PARENT.pop(str(kid), None)
+    return kids
 
 # =========================
 # Streaming: cancel sibling on fill
@@ -220,17 +330,31 @@ async def on_trade_update(u):
     try:
         event = u.event
         oid   = u.order.id
-        for parent, kids in list(OCO_BOOK.items()):
-            for leg in ("tp_id", "sl_id"):
-                if kids.get(leg) == oid:
-                    if event == "fill":
-                        sib = kids["sl_id"] if leg == "tp_id" else kids["tp_id"]
-                        if sib:
-                            try: trading.cancel_order_by_id(sib)
-                            except Exception: pass
-                        OCO_BOOK.pop(parent, None)
-                    elif event in ("canceled", "rejected", "expired", "done_for_day"):
-                        OCO_BOOK.pop(parent, None)
+
+        # Entry order someone is waiting on in wait_for_fill(). This handler
+        # runs on the stream thread, so hand the result to the waiter's loop.
+        pending = PENDING_FILLS.get(str(oid))
+        if pending:
+            loop, fut = pending
+            if event in ("fill", "partial_fill"):
+                price = _order_filled_price(u.order)
+                if price is not None:
+                    loop.call_soon_threadsafe(_settle_fill, fut, price, None)
+            elif event in ("canceled", "rejected", "expired"):
+                exc = HTTPException(status_code=409, detail=f"Entry order {event}")
+                loop.call_soon_threadsafe(_settle_fill, fut, None, exc)
+
+        # OCO child leg: O(1) lookup through the reverse index
+        with OCO_LOCK:
+            parent, leg = CHILD_TO_PARENT.get(str(oid), (None, None))
+            kids = None
+            if parent is not None and event in ("fill", "canceled", "rejected", "expired", "done_for_day"):
+                kids = _pop_oco(parent)
+        if kids and event == "fill":
+            sib = kids["sl_id"] if leg == "tp_id" else kids["tp_id"]
+            if sib:
+                try: await asyncio.to_thread(trading.cancel_order_by_id, sib)
+                except Exception: pass
     except Exception:
         # keep stream alive
         pass
@@ -238,7 +362,6 @@ async def on_trade_update(u):
 def ensure_stream():
     global STREAM_RUNNING
     if not STREAM_RUNNING:
-        import threading
         t = threading.Thread(target=stream.run, daemon=True)
         t.start()
         STREAM_RUNNING = True
@@ -248,45 +371,68 @@ def ensure_stream():
 # =========================
 async def flatten_all_options():
     try:
-        trading.cancel_orders()
+        await asyncio.to_thread(trading.cancel_orders)
     except Exception:
         pass
     try:
-        positions = trading.get_all_positions()
+        positions = await asyncio.to_thread(trading.get_all_positions)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch positions: {e}")
 
+    reqs = []
     for p in positions:
+        if not str(p.asset_class).lower().startswith("option"):
+            continue
         try:
-            if str(p.asset_class).lower().startswith("option"):
-                qty = abs(int(float(p.qty)))
-                if qty == 0:
-                    continue
-                side = OrderSide.SELL if float(p.qty) > 0 else OrderSide.BUY
-                trading.submit_order(MarketOrderRequest(
-                    symbol=p.symbol, qty=qty, side=side, time_in_force=TimeInForce.DAY
-                ))
+            p_qty = float(p.qty)
         except Exception:
-            pass
+            continue
+        qty = abs(int(p_qty))
+        if qty == 0:
+            continue
+        side = OrderSide.SELL if p_qty > 0 else OrderSide.BUY
+        reqs.append(MarketOrderRequest(
+            symbol=p.symbol, qty=qty, side=side, time_in_force=TimeInForce.DAY
+        ))
+
+    # Submit every close at once so the batch takes ~one round-trip before the cutoff
+    results = await asyncio.gather(
+        *(asyncio.to_thread(trading.submit_order, r) for r in reqs), return_exceptions=True
+    )
+    for r, res in zip(reqs, results):
+        if isinstance(res, BaseException):
+            print(f"EOD-FLATTEN ERROR: Failed to close {r.symbol}: {res}")
+
+def next_eod_run(after: datetime) -> datetime:
+    """Next weekday EOD_HHMM in LOCAL_TZ strictly after `after`."""
+    target = after.replace(hour=EOD_HOUR, minute=EOD_MINUTE, second=0, microsecond=0)
+    if target <= after:
+        target += timedelta(days=1)
+    while target.weekday() > 4:
+        target += timedelta(days=1)
+    return target
 
 async def eod_loop():
-    global _eod_last_run_date
     if not EOD_ON:
         return
+    last_run = None
     while True:
+        now = datetime.now(LOCAL_TZ)
+        # Schedule from the last cutoff too, so waking a hair early never
+        # flattens twice for the same day
+        target = next_eod_run(max(now, last_run) if last_run else now)
+        # Compare timestamps: aware datetimes sharing a tzinfo subtract as
+        # wall-clock time, which is off by an hour across a DST change
+        await asyncio.sleep(max(0.0, target.timestamp() - datetime.now(LOCAL_TZ).timestamp()))
         try:
-            now = datetime.now(LOCAL_TZ)
-            if now.strftime("%H:%M") >= EOD_HHMM and _eod_last_run_date != now.date().isoformat():
-                await flatten_all_options()
-                _eod_last_run_date = now.date().isoformat()
+            await flatten_all_options()
         except Exception:
             pass
-        await asyncio.sleep(20)
+        last_run = target
 
 def ensure_eod_thread():
     global EOD_THREAD_STARTED
     if EOD_ON and not EOD_THREAD_STARTED:
-        import threading
         def _runner():
             asyncio.run(eod_loop())
         t = threading.Thread(target=_runner, daemon=True)
@@ -301,6 +447,19 @@ def _start():
     ensure_stream()
     ensure_eod_thread()
 
+@app.on_event("startup")
+async def _open_http_client():
+    # One long-lived HTTP/2 client for market data and contract lookups, so
+    # requests reuse kept-alive connections instead of a new TLS handshake each
+    app.state.http = httpx.AsyncClient(
+        http2=True, timeout=15, headers=HEADERS,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+    )
+
+@app.on_event("shutdown")
+async def _close_http_client():
+    await app.state.http.aclose()
+
 @app.get("/")
 def root():
     return {"ok": True, "msg": "VWAP Options Trader up", "see": "/health"}
@@ -343,30 +502,31 @@ def force_close(payload: dict):
     """
     symbol: Optional[str] = payload.get("symbol")
     underlying: Optional[str] = payload.get("underlying")
+    und = underlying.upper() if underlying else None
 
     # Cancel open orders for that target first
     try:
-        for o in trading.get_orders(status="open"):
-            if (symbol and o.symbol == symbol) or (underlying and underlying.upper() in o.symbol):
-                try: trading.cancel_order_by_id(o.id)
-                except Exception: pass
+        stale = [o.id for o in trading.get_orders(status="open")
+                 if (symbol and o.symbol == symbol) or (und and und in o.symbol)]
+        for oid in stale:
+            try: trading.cancel_order_by_id(oid)
+            except Exception: pass
     except Exception:
         pass
 
     flattened: List[Dict[str, Any]] = []
     try:
-        for p in trading.get_all_positions():
-            if not str(p.asset_class).lower().startswith("option"):
-                continue
-            if symbol and p.symbol != symbol:
-                continue
-            if underlying and (underlying.upper() not in p.symbol):
-                continue
-            qty = abs(int(float(p.qty)))
+        targets = [p for p in trading.get_all_positions()
+                   if str(p.asset_class).lower().startswith("option")
+                   and (not symbol or p.symbol == symbol)
+                   and (not und or und in p.symbol)]
+        for p in targets:
+            p_qty = float(p.qty)
+            qty = abs(int(p_qty))
             if qty == 0:
                 flattened.append({"symbol": p.symbol, "status": "already_flat"})
                 continue
-            side = OrderSide.SELL if float(p.qty) > 0 else OrderSide.BUY
+            side = OrderSide.SELL if p_qty > 0 else OrderSide.BUY
             ord = trading.submit_order(MarketOrderRequest(
                 symbol=p.symbol, qty=qty, side=side, time_in_force=TimeInForce.DAY
             ))
@@ -383,7 +543,7 @@ def force_close(payload: dict):
 async def trade(req: TradeRequest):
     is_call = req.side == "long_call"
     symbol  = await choose_contract_symbol(
-        underlying=req.underlying, expiry=req.expiry, is_call=is_call,
+        app.state.http, underlying=req.underlying, expiry=req.expiry, is_call=is_call,
         strike=req.strike, _target_delta_unused=req.target_delta
     )
 
@@ -397,7 +557,7 @@ async def trade(req: TradeRequest):
         entry_req = MarketOrderRequest(symbol=symbol, qty=req.contracts, side=OrderSide.BUY,
                                        time_in_force=TimeInForce.DAY)
 
-    entry = trading.submit_order(entry_req)
+    entry = await asyncio.to_thread(trading.submit_order, entry_req)
     avg   = await wait_for_fill(entry.id)
 
     # OCO exits on the option premium
@@ -424,6 +584,6 @@ async def dry_run_pick(req: SimpleTrade):
     sig = req.signal.lower().strip()
     is_call = sig == "long"
     sym = await choose_contract_symbol(
-        underlying=req.underlying, expiry=None, is_call=is_call, strike=None, _target_delta_unused=0.5
+        app.state.http, underlying=req.underlying, expiry=None, is_call=is_call, strike=None, _target_delta_unused=0.5
     )
     return {"ok": True, "chosen_contract": sym}
@@ -1,11 +1,17 @@
 import os
-import requests
-from datetime import datetime, date, time
-import pytz
-from flask import Flask, request, jsonify
-import json
-
-app = Flask(__name__)
+import asyncio
+import queue
+from collections import defaultdict
+import threading
+import httpx
+from datetime import datetime, date, time, timedelta, timezone
+from time import monotonic
+from zoneinfo import ZoneInfo
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import orjson
+
+app = FastAPI(title="Breakout Trading Bot")
 
 # --- Alpaca API Configuration ---
 # Ensure these environment variables are set in your deployment environment
@@ -27,89 +33,204 @@ STRATEGY_NAME = "BREAKOUT_930"
 ENFORCE_MARKET_HOURS = True
 AUTO_CLOSE_BEFORE_MINUTES = 5
 
+# Trading session boundaries (ET)
+PRE_MARKET_START = time(4, 0)    # 4:00 AM ET
+MARKET_CLOSE = time(16, 0)       # 4:00 PM ET
+# Time to start auto-closing (e.g., 3:55 PM for a 5-minute buffer)
+CLOSE_BUFFER_TIME = (datetime.combine(date.today(), MARKET_CLOSE) - timedelta(minutes=AUTO_CLOSE_BEFORE_MINUTES)).time()
+
+# Timezones resolved once rather than on every call
+ET_TZ = ZoneInfo("America/New_York")
+PT_TZ = ZoneInfo("America/Los_Angeles")
+
 HEADERS = {
     "APCA-API-KEY-ID": ALPACA_API_KEY,
     "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY
 }
 
+JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
+# One long-lived HTTP/2 client for every Alpaca call: webhooks reuse kept-alive
+# connections, and concurrent probes multiplex over the same one. httpx rejects
+# None header values, so unset keys are left out: the app still starts and
+# serves / and /trades, and Alpaca answers 401 until the keys are set.
+CLIENT = httpx.AsyncClient(
+    base_url=BASE_URL, headers={k: v for k, v in HEADERS.items() if v is not None}, http2=True,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    timeout=httpx.Timeout(10.0, connect=3.0),
+)
+
+@app.on_event("shutdown")
+async def _close_client():
+    await CLIENT.aclose()
+
+# Market open/closed only flips twice a day, so /v2/clock is cached briefly
+CLOCK_CACHE_TTL = 15  # seconds
+_CLOCK_CACHE = {"exp": 0.0, "open": False}
+_CLOCK_LOCK = asyncio.Lock()
+
+# Equity and buying power drift slowly between alerts, so /v2/account is
+# cached briefly and dropped whenever an order goes through
+ACCOUNT_CACHE_TTL = 10  # seconds
+_ACCOUNT_CACHE = {"exp": 0.0, "data": None, "gen": 0}
+_ACCOUNT_LOCK = asyncio.Lock()
+
+# Serializes the check-then-order path per symbol
+_SYMBOL_LOCKS = defaultdict(asyncio.Lock)
+
 # --- Daily Trading Tracker ---
-# Simple file-based tracking to ensure only one trade per day
+# Tracks one trade per symbol per day. The log lives in memory and is
+# persisted to TRADES_LOG_FILE by a background writer, so webhooks never
+# touch the filesystem.
 TRADES_LOG_FILE = "daily_trades.json"
 
 def load_daily_trades():
     """Load the daily trades log from file"""
     try:
-        with open(TRADES_LOG_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        with open(TRADES_LOG_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
         return {}
 
 def save_daily_trades(trades_log):
-    """Save the daily trades log to file"""
-    with open(TRADES_LOG_FILE, 'w') as f:
-        json.dump(trades_log, f, indent=2)
+    """Save the daily trades log to file atomically (temp file + rename)"""
+    tmp_path = f"{TRADES_LOG_FILE}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(trades_log, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, TRADES_LOG_FILE)
+
+_TRADES = load_daily_trades()
+_TRADES_LOCK = threading.RLock()
+_LAST_CLEANUP = None  # date cleanup_old_trades() last ran
+# Snapshots waiting to be written; None stops the writer
+_SAVE_QUEUE = queue.Queue()
+
+def _trades_writer():
+    """Persist queued snapshots of the trades log, newest wins."""
+    while True:
+        snapshot = _SAVE_QUEUE.get()
+        stop = snapshot is None
+        # Only the latest state matters; skip any older snapshots queued up
+        while not _SAVE_QUEUE.empty():
+            pending = _SAVE_QUEUE.get_nowait()
+            if pending is None:
+                stop = True
+            else:
+                snapshot = pending
+        if snapshot is not None:
+            try:
+                save_daily_trades(snapshot)
+            except OSError as e:
+                print(f"Error saving trades log: {e}")
+        if stop:
+            return
+
+_TRADES_WRITER = threading.Thread(target=_trades_writer, name="trades-writer", daemon=True)
+_TRADES_WRITER.start()
+
+def _schedule_save():
+    """Queue a copy of the log for the writer. Caller holds _TRADES_LOCK."""
+    _SAVE_QUEUE.put(get_trades_log())
+
+def get_trades_log():
+    """Copy of the whole trades log, safe to serialize outside the lock"""
+    with _TRADES_LOCK:
+        return {day: dict(symbols) for day, symbols in _TRADES.items()}
 
 def has_traded_today(symbol):
     """Check if we've already traded this symbol today"""
-    trades_log = load_daily_trades()
     today_str = date.today().isoformat()
-    return trades_log.get(today_str, {}).get(symbol, False)
+    with _TRADES_LOCK:
+        return _TRADES.get(today_str, {}).get(symbol, False)
 
 def mark_traded_today(symbol):
     """Mark that we've traded this symbol today"""
-    trades_log = load_daily_trades()
     today_str = date.today().isoformat()
-    
-    if today_str not in trades_log:
-        trades_log[today_str] = {}
-    
-    trades_log[today_str][symbol] = True
-    save_daily_trades(trades_log)
+    with _TRADES_LOCK:
+        _TRADES.setdefault(today_str, {})[symbol] = True
+        _schedule_save()
+
+def clear_trades_for(day_str):
+    """Drop one day's entries; returns False if there were none"""
+    with _TRADES_LOCK:
+        if _TRADES.pop(day_str, None) is None:
+            return False
+        _schedule_save()
+        return True
 
 def cleanup_old_trades():
-    """Clean up trades older than 7 days to keep file size manageable"""
-    trades_log = load_daily_trades()
+    """Clean up trades older than 7 days; runs at most once per day"""
+    global _LAST_CLEANUP
     today = date.today()
-    
-    dates_to_remove = []
-    for date_str in trades_log.keys():
-        trade_date = date.fromisoformat(date_str)
-        if (today - trade_date).days > 7:
-            dates_to_remove.append(date_str)
-    
-    for date_str in dates_to_remove:
-        del trades_log[date_str]
-    
-    if dates_to_remove:
-        save_daily_trades(trades_log)
+    if _LAST_CLEANUP == today:
+        return
+
+    with _TRADES_LOCK:
+        dates_to_remove = [date_str for date_str in _TRADES
+                           if (today - date.fromisoformat(date_str)).days > 7]
+        for date_str in dates_to_remove:
+            del _TRADES[date_str]
+        if dates_to_remove:
+            _schedule_save()
+        _LAST_CLEANUP = today
+
+cleanup_old_trades()
+
+@app.on_event("shutdown")
+def _flush_trades():
+    # Let the writer persist anything still queued before the process exits
+    _SAVE_QUEUE.put(None)
+    _TRADES_WRITER.join(timeout=5)
 
 # --- Helper Functions ---
 
-def get_position_qty(symbol):
+async def get_position_qty(symbol):
     """
     Retrieves the quantity of an open position for a given symbol.
     Returns 0 if no position exists.
     Positive value = long position, Negative value = short position
     """
     try:
-        response = requests.get(f"{BASE_URL}/v2/positions/{symbol}", headers=HEADERS)
+        response = await CLIENT.get(f"/v2/positions/{symbol}")
         response.raise_for_status()
-        return float(response.json()["qty"])
-    except requests.exceptions.HTTPError as e:
+        return float(orjson.loads(response.content)["qty"])
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
             return 0
         else:
             print(f"Error checking position for {symbol}: {e.response.text}")
             raise
 
-def get_buying_power():
+def invalidate_account_cache():
+    """Force the next get_account() to re-read /v2/account"""
+    _ACCOUNT_CACHE["gen"] += 1
+    _ACCOUNT_CACHE["exp"] = 0.0
+
+async def get_account():
+    """Account data from /v2/account, cached for ACCOUNT_CACHE_TTL seconds"""
+    if monotonic() < _ACCOUNT_CACHE["exp"]:
+        return _ACCOUNT_CACHE["data"]
+
+    async with _ACCOUNT_LOCK:
+        if monotonic() < _ACCOUNT_CACHE["exp"]:
+            return _ACCOUNT_CACHE["data"]
+
+        gen = _ACCOUNT_CACHE["gen"]
+        account_response = await CLIENT.get("/v2/account")
+        account_response.raise_for_status()
+        account_data = orjson.loads(account_response.content)
+        # An order placed while this fetch was in flight makes it stale
+        if gen == _ACCOUNT_CACHE["gen"]:
+            _ACCOUNT_CACHE["data"] = account_data
+            _ACCOUNT_CACHE["exp"] = monotonic() + ACCOUNT_CACHE_TTL
+        return account_data
+
+async def get_buying_power():
     """
     Retrieves the total account 'equity' and calculates 10% allocation.
     For short selling, also considers available buying power for margin requirements.
     """
-    account_response = requests.get(f"{BASE_URL}/v2/account", headers=HEADERS)
-    account_response.raise_for_status()
-    account_data = account_response.json()
+    account_data = await get_account()
     
     total_equity = float(account_data["equity"])
     available_buying_power = float(account_data["buying_power"])
@@ -128,16 +249,41 @@ def get_buying_power():
     
     return min(desired_allocation, available_buying_power)
 
-def is_market_open():
-    """Checks if the market is currently open."""
-    clock_response = requests.get(f"{BASE_URL}/v2/clock", headers=HEADERS)
-    clock_response.raise_for_status()
-    return clock_response.json()["is_open"]
+async def is_market_open():
+    """
+    Checks if the market is currently open.
+    The answer is cached for CLOCK_CACHE_TTL seconds, and never past the
+    next open/close transition reported by Alpaca.
+    """
+    if monotonic() < _CLOCK_CACHE["exp"]:
+        return _CLOCK_CACHE["open"]
+
+    # Only one request refreshes; concurrent webhooks wait and reuse its answer
+    async with _CLOCK_LOCK:
+        if monotonic() < _CLOCK_CACHE["exp"]:
+            return _CLOCK_CACHE["open"]
+
+        clock_response = await CLIENT.get("/v2/clock")
+        clock_response.raise_for_status()
+        clock = orjson.loads(clock_response.content)
+        market_open = clock["is_open"]
+
+        ttl = CLOCK_CACHE_TTL
+        transition = clock.get("next_close" if market_open else "next_open")
+        if transition:
+            try:
+                seconds_left = (datetime.fromisoformat(transition) - datetime.now(timezone.utc)).total_seconds()
+                ttl = max(0.0, min(ttl, seconds_left))
+            except ValueError:
+                pass
+
+        _CLOCK_CACHE["open"] = market_open
+        _CLOCK_CACHE["exp"] = monotonic() + ttl
+        return market_open
 
 def get_current_et_time():
     """Get current time in Eastern Time"""
-    et_tz = pytz.timezone('US/Eastern')
-    return datetime.now(et_tz)
+    return datetime.now(ET_TZ)
 
 def is_within_trading_hours():
     """
@@ -156,16 +302,8 @@ def is_within_trading_hours():
     if current_weekday > 4:
         return False
     
-    # Define trading hours
-    pre_market_start = time(4, 0)
-    regular_start = time(9, 30)
-    regular_end = time(16, 0)
-    
     # Check if within pre-market or regular hours
-    if pre_market_start <= current_time < regular_end:
-        return True
-    
-    return False
+    return PRE_MARKET_START <= current_time < MARKET_CLOSE
 
 def is_near_market_close():
     """Check if we're within AUTO_CLOSE_BEFORE_MINUTES of market close (4:00 PM ET)"""
@@ -173,67 +311,71 @@ def is_near_market_close():
         return False
     
     current_et = get_current_et_time()
-    current_time = current_et.time()
-    current_weekday = current_et.weekday()
-    
-    if current_weekday > 4:
-        return False
-    
-    # Calculate close buffer time
-    close_hour = 15 if AUTO_CLOSE_BEFORE_MINUTES >= 60 else 16
-    close_minute = (60 - AUTO_CLOSE_BEFORE_MINUTES) if AUTO_CLOSE_BEFORE_MINUTES < 60 else (60 - (AUTO_CLOSE_BEFORE_MINUTES - 60))
-    close_buffer_time = time(close_hour, close_minute)
-    market_close = time(16, 0)
-    
-    if close_buffer_time <= current_time < market_close:
-        return True
-    
-    return False
+    return current_et.weekday() <= 4 and CLOSE_BUFFER_TIME <= current_et.time() < MARKET_CLOSE
 
-def get_all_positions():
+async def get_all_positions():
     """Get all open positions"""
     try:
-        response = requests.get(f"{BASE_URL}/v2/positions", headers=HEADERS)
+        response = await CLIENT.get("/v2/positions")
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.HTTPError as e:
+        return orjson.loads(response.content)
+    except httpx.HTTPStatusError as e:
         print(f"Error fetching positions: {e.response.text}")
         return []
 
-def close_all_positions():
-    """Close all open positions before market close"""
-    positions = get_all_positions()
-    
-    if not positions:
-        print("No open positions to close.")
+async def _close_symbol(symbol):
+    """Market-close a single position; returns True on success"""
+    try:
+        response = await CLIENT.delete(f"/v2/positions/{symbol}")
+        response.raise_for_status()
+        print(f"AUTO-CLOSE: Closed position for {symbol}")
         return True
-    
-    print(f"AUTO-CLOSE: Closing {len(positions)} positions before market close")
-    
-    success_count = 0
-    for position in positions:
-        try:
-            symbol = position['symbol']
-            close_url = f"{BASE_URL}/v2/positions/{symbol}"
-            response = requests.delete(close_url, headers=HEADERS)
-            response.raise_for_status()
-            print(f"AUTO-CLOSE: Closed position for {symbol}")
-            success_count += 1
-        except Exception as e:
-            print(f"AUTO-CLOSE ERROR: Failed to close {symbol}: {e}")
-    
-    return success_count == len(positions)
+    except Exception as e:
+        print(f"AUTO-CLOSE ERROR: Failed to close {symbol}: {e}")
+        return False
 
-def close_position(symbol, alert_price_str, market_is_open):
+async def close_all_positions():
+    """
+    Close all open positions before market close.
+    A single DELETE /v2/positions liquidates everything (and cancels open
+    orders); symbols it reports as failed are retried one by one.
+    """
+    try:
+        response = await CLIENT.delete("/v2/positions", params={"cancel_orders": "true"})
+        response.raise_for_status()
+        results = orjson.loads(response.content)
+    except Exception as e:
+        print(f"AUTO-CLOSE ERROR: Batch close failed, closing per symbol: {e}")
+        failed = [position['symbol'] for position in await get_all_positions()]
+    else:
+        if not results:
+            print("No open positions to close.")
+            return True
+
+        print(f"AUTO-CLOSE: Closing {len(results)} positions before market close")
+        failed = []
+        for result in results:
+            if 200 <= result.get("status", 0) < 300:
+                print(f"AUTO-CLOSE: Closed position for {result['symbol']}")
+            else:
+                failed.append(result['symbol'])
+
+    closed = await asyncio.gather(*(_close_symbol(symbol) for symbol in failed))
+    invalidate_account_cache()
+    return all(closed)
+
+async def close_position(symbol, alert_price_str, market_is_open, current_qty=None):
     """
     Closes the entire position for a given symbol.
     Handles both long and short positions automatically.
+    Pass current_qty when the caller already looked it up.
     """
-    current_qty = get_position_qty(symbol)
+    if current_qty is None:
+        current_qty = await get_position_qty(symbol)
     if current_qty == 0:
         msg = f"No open position for {symbol} to close."
         print(msg)
-        return jsonify({"message": msg}), 200
+        return JSONResponse({"message": msg})
 
     # Determine if it's a long or short position
     is_long_position = current_qty > 0
@@ -243,15 +385,16 @@ def close_position(symbol, alert_price_str, market_is_open):
 
     if market_is_open:
         # During market hours, use market order via DELETE endpoint
-        close_position_url = f"{BASE_URL}/v2/positions/{symbol}"
+        close_position_url = f"/v2/positions/{symbol}"
         try:
-            response = requests.delete(close_position_url, headers=HEADERS)
+            response = await CLIENT.delete(close_position_url)
             response.raise_for_status()
+            invalidate_account_cache()
             print(f"Market close order for {symbol} submitted successfully.")
-            return jsonify({"message": f"Market close order submitted for {'LONG' if is_long_position else 'SHORT'} position", "data": response.json()}), response.status_code
-        except requests.exceptions.HTTPError as e:
+            return JSONResponse({"message": f"Market close order submitted for {'LONG' if is_long_position else 'SHORT'} position", "data": orjson.loads(response.content)}, status_code=response.status_code)
+        except httpx.HTTPStatusError as e:
             print(f"Error closing position {symbol}: {e.response.text}")
-            return jsonify({"error": f"Failed to close position: {e.response.text}"}), e.response.status_code
+            return JSONResponse({"error": f"Failed to close position: {e.response.text}"}, status_code=e.response.status_code)
     else:
         # During extended hours, use limit order
         try:
@@ -271,98 +414,31 @@ def close_position(symbol, alert_price_str, market_is_open):
                 "extended_hours": True
             }
 
-            order_response = requests.post(f"{BASE_URL}/v2/orders", json=order_data, headers=HEADERS)
+            order_response = await CLIENT.post("/v2/orders", content=orjson.dumps(order_data), headers=JSON_CONTENT_TYPE)
             order_response.raise_for_status()
+            invalidate_account_cache()
             print(f"Limit close order ({exit_side}) for {symbol} placed successfully for extended hours.")
-            return jsonify({"message": f"Limit close order submitted for {'LONG' if is_long_position else 'SHORT'} position", "data": order_response.json()}), order_response.status_code
+            return JSONResponse({"message": f"Limit close order submitted for {'LONG' if is_long_position else 'SHORT'} position", "data": orjson.loads(order_response.content)}, status_code=order_response.status_code)
         except (ValueError, TypeError):
-            return jsonify({"error": f"Invalid price format received for closing order: {alert_price_str}"}), 400
-        except requests.exceptions.HTTPError as e:
+            return JSONResponse({"error": f"Invalid price format received for closing order: {alert_price_str}"}, status_code=400)
+        except httpx.HTTPStatusError as e:
             print(f"Error placing limit close order: {e.response.text}")
-            return jsonify({"error": f"Failed to place limit close order: {e.response.text}"}), e.response.status_code
-
-# --- Main Webhook Endpoint ---
+            return JSONResponse({"error": f"Failed to place limit close order: {e.response.text}"}, status_code=e.response.status_code)
 
-@app.route("/webhook", methods=["POST"])
-def webhook():
+async def execute_signal(symbol, action, alert_price, alert_price_str):
     """
-    Receives alerts from TradingView and places orders for breakout strategy.
-    
-    Expected alert format from TradingView:
-    {
-        "ticker": "SYMBOL",  # Required: Any valid stock symbol
-        "action": "buy",     # "buy" or "sell" 
-        "price": "150.25",
-        "message": "Long entry above first candle high"  # optional
-    }
-    
-    Action mapping based on Pine Script alert messages:
-    - "buy" = Long entry OR Short exit
-    - "sell" = Short entry OR Long exit
+    Runs the strategy for one validated alert: looks up the position, then
+    enters, exits or ignores. Callers hold the symbol's lock.
     """
-    try:
-        data = request.get_json()
-        print(f"Received alert for {STRATEGY_NAME}: {data}")
-    except Exception:
-        return jsonify({"error": "Invalid JSON payload"}), 400
-
-    # Extract data (ticker is required)
-    symbol = data.get("ticker")
-    action = data.get("action", "").lower()
-    alert_price_str = data.get("price")
-    message = data.get("message", "")
-
-    if not all([symbol, action, alert_price_str]):
-        return jsonify({"error": "Invalid payload, missing ticker, action, or price"}), 400
-    
-    symbol = symbol.upper()  # Ensure uppercase for consistency
-    
-    if action not in ["buy", "sell"]:
-        return jsonify({"error": "Action must be 'buy' or 'sell'"}), 400
-    
-    # Check trading enabled flag
-    if not ENABLE_TRADING:
-        msg = f"Trading is currently disabled. No order submitted for {symbol}."
-        print(msg)
-        return jsonify({"message": msg, "trading_disabled": True}), 200
-    
-    # Cleanup old trades log
-    cleanup_old_trades()
-    
-    # === MARKET HOURS CHECKS ===
-    
-    # Auto-close check
-    if ENFORCE_MARKET_HOURS and is_near_market_close():
-        print("AUTO-CLOSE TRIGGERED: Near market close, closing all positions...")
-        close_success = close_all_positions()
-        msg = f"Auto-close triggered {AUTO_CLOSE_BEFORE_MINUTES} min before market close."
-        return jsonify({"message": msg, "auto_close": True}), 200
-    
-    # Trading hours check
-    if ENFORCE_MARKET_HOURS and not is_within_trading_hours():
-        current_et = get_current_et_time()
-        msg = f"BLOCKED: Trading outside allowed hours. Current time: {current_et.strftime('%I:%M %p ET')}"
-        print(msg)
-        return jsonify({"message": msg, "blocked_time": current_et.isoformat()}), 200
-    
-    # Check market status
-    market_is_open = is_market_open()
-    
-    # Get current position
-    current_qty = get_position_qty(symbol)
+    # The position alone decides whether this alert is acted on; market status
+    # and buying power are only fetched once an order will actually be sent
+    current_qty = await get_position_qty(symbol)
     is_long_position = current_qty > 0
     is_short_position = current_qty < 0
     has_position = current_qty != 0
     
     print(f"Current position for {symbol}: {current_qty} shares")
     
-    try:
-        alert_price = float(alert_price_str)
-        if alert_price <= 0:
-            return jsonify({"error": "Invalid price received from alert."}), 400
-    except (ValueError, TypeError):
-        return jsonify({"error": f"Invalid price format: {alert_price_str}"}), 400
-    
     # === STRATEGY LOGIC ===
     # Based on Pine Script:
     # - "buy" alert_message for Long entries and Short exits
@@ -372,7 +448,8 @@ def webhook():
         if is_short_position:
             # SHORT EXIT: Close short position
             print(f"SHORT EXIT signal received for {symbol}")
-            return close_position(symbol, alert_price_str, market_is_open)
+            market_is_open = await is_market_open()
+            return await close_position(symbol, alert_price_str, market_is_open, current_qty)
         elif not has_position:
             # LONG ENTRY: Enter long position
             print(f"LONG ENTRY signal received for {symbol}")
@@ -381,17 +458,18 @@ def webhook():
             if has_traded_today(symbol):
                 msg = f"Already traded {symbol} today. Only one trade per day allowed."
                 print(msg)
-                return jsonify({"message": msg, "daily_limit_reached": True}), 200
+                return JSONResponse({"message": msg, "daily_limit_reached": True})
+            
+            market_is_open, buying_power = await asyncio.gather(is_market_open(), get_buying_power())
             
             # Calculate position size (10% of equity)
-            buying_power = get_buying_power()
             trade_allocation = buying_power
             qty = int(trade_allocation // alert_price)
             
             if qty < 1:
                 msg = f"Not enough funds for one share at ${alert_price:.2f} with 10% equity allocation."
                 print(msg)
-                return jsonify({"message": msg}), 200
+                return JSONResponse({"message": msg})
             
             # Prepare order
             order_data = {
@@ -412,32 +490,34 @@ def webhook():
             
             # Submit order
             try:
-                order_response = requests.post(f"{BASE_URL}/v2/orders", json=order_data, headers=HEADERS)
+                order_response = await CLIENT.post("/v2/orders", content=orjson.dumps(order_data), headers=JSON_CONTENT_TYPE)
                 order_response.raise_for_status()
+                invalidate_account_cache()
                 
                 # Mark as traded today
                 mark_traded_today(symbol)
                 
                 print(f"LONG entry order for {qty} shares of {symbol} placed successfully.")
-                return jsonify({
+                return JSONResponse({
                     "message": f"LONG entry order placed for {qty} shares", 
-                    "data": order_response.json(),
+                    "data": orjson.loads(order_response.content),
                     "daily_trade_logged": True
-                }), order_response.status_code
-            except requests.exceptions.HTTPError as e:
+                }, status_code=order_response.status_code)
+            except httpx.HTTPStatusError as e:
                 print(f"Error placing LONG entry order: {e.response.text}")
-                return jsonify({"error": f"Failed to place LONG entry order: {e.response.text}"}), e.response.status_code
+                return JSONResponse({"error": f"Failed to place LONG entry order: {e.response.text}"}, status_code=e.response.status_code)
         else:
             # Already have long position
             msg = f"Already have LONG position for {symbol}, ignoring buy signal."
             print(msg)
-            return jsonify({"message": msg}), 200
+            return JSONResponse({"message": msg})
     
     elif action == "sell":
         if is_long_position:
             # LONG EXIT: Close long position
             print(f"LONG EXIT signal received for {symbol}")
-            return close_position(symbol, alert_price_str, market_is_open)
+            market_is_open = await is_market_open()
+            return await close_position(symbol, alert_price_str, market_is_open, current_qty)
         elif not has_position:
             # SHORT ENTRY: Enter short position
             print(f"SHORT ENTRY signal received for {symbol}")
@@ -446,17 +526,18 @@ def webhook():
             if has_traded_today(symbol):
                 msg = f"Already traded {symbol} today. Only one trade per day allowed."
                 print(msg)
-                return jsonify({"message": msg, "daily_limit_reached": True}), 200
+                return JSONResponse({"message": msg, "daily_limit_reached": True})
+            
+            market_is_open, buying_power = await asyncio.gather(is_market_open(), get_buying_power())
             
             # Calculate position size for short (10% of equity)
-            buying_power = get_buying_power()
             trade_allocation = buying_power
             qty = int(trade_allocation // alert_price)
             
             if qty < 1:
                 msg = f"Not enough funds for short position at ${alert_price:.2f} with 10% equity allocation."
                 print(msg)
-                return jsonify({"message": msg}), 200
+                return JSONResponse({"message": msg})
             
             # Prepare short order
             order_data = {
@@ -477,41 +558,119 @@ def webhook():
             
             # Submit short order
             try:
-                order_response = requests.post(f"{BASE_URL}/v2/orders", json=order_data, headers=HEADERS)
+                order_response = await CLIENT.post("/v2/orders", content=orjson.dumps(order_data), headers=JSON_CONTENT_TYPE)
                 order_response.raise_for_status()
+                invalidate_account_cache()
                 
                 # Mark as traded today
                 mark_traded_today(symbol)
                 
                 print(f"SHORT entry order for {qty} shares of {symbol} placed successfully.")
-                return jsonify({
+                return JSONResponse({
                     "message": f"SHORT entry order placed for {qty} shares", 
-                    "data": order_response.json(),
+                    "data": orjson.loads(order_response.content),
                     "daily_trade_logged": True
-                }), order_response.status_code
-            except requests.exceptions.HTTPError as e:
+                }, status_code=order_response.status_code)
+            except httpx.HTTPStatusError as e:
                 print(f"Error placing SHORT entry order: {e.response.text}")
-                return jsonify({"error": f"Failed to place SHORT entry order: {e.response.text}"}), e.response.status_code
+                return JSONResponse({"error": f"Failed to place SHORT entry order: {e.response.text}"}, status_code=e.response.status_code)
         else:
             # Already have short position
             msg = f"Already have SHORT position for {symbol}, ignoring sell signal."
             print(msg)
-            return jsonify({"message": msg}), 200
+            return JSONResponse({"message": msg})
+
+
+# --- Main Webhook Endpoint ---
+
+@app.post("/webhook")
+async def webhook(request: Request):
+    """
+    Receives alerts from TradingView and places orders for breakout strategy.
+    
+    Expected alert format from TradingView:
+    {
+        "ticker": "SYMBOL",  # Required: Any valid stock symbol
+        "action": "buy",     # "buy" or "sell" 
+        "price": "150.25",
+        "message": "Long entry above first candle high"  # optional
+    }
+    
+    Action mapping based on Pine Script alert messages:
+    - "buy" = Long entry OR Short exit
+    - "sell" = Short entry OR Long exit
+    """
+    try:
+        data = orjson.loads(await request.body())
+        print(f"Received alert for {STRATEGY_NAME}: {data}")
+    except Exception:
+        return JSONResponse({"error": "Invalid JSON payload"}, status_code=400)
+
+    # Extract data (ticker is required)
+    symbol = data.get("ticker")
+    action = data.get("action", "").lower()
+    alert_price_str = data.get("price")
+    message = data.get("message", "")
+
+    if not all([symbol, action, alert_price_str]):
+        return JSONResponse({"error": "Invalid payload, missing ticker, action, or price"}, status_code=400)
+    
+    symbol = symbol.upper()  # Ensure uppercase for consistency
+    
+    if action not in ["buy", "sell"]:
+        return JSONResponse({"error": "Action must be 'buy' or 'sell'"}, status_code=400)
+    
+    # Check trading enabled flag
+    if not ENABLE_TRADING:
+        msg = f"Trading is currently disabled. No order submitted for {symbol}."
+        print(msg)
+        return JSONResponse({"message": msg, "trading_disabled": True})
+    
+    # Cleanup old trades log
+    cleanup_old_trades()
+    
+    # === MARKET HOURS CHECKS ===
+    
+    # Auto-close check
+    if ENFORCE_MARKET_HOURS and is_near_market_close():
+        print("AUTO-CLOSE TRIGGERED: Near market close, closing all positions...")
+        close_success = await close_all_positions()
+        msg = f"Auto-close triggered {AUTO_CLOSE_BEFORE_MINUTES} min before market close."
+        return JSONResponse({"message": msg, "auto_close": True})
+    
+    # Trading hours check
+    if ENFORCE_MARKET_HOURS and not is_within_trading_hours():
+        current_et = get_current_et_time()
+        msg = f"BLOCKED: Trading outside allowed hours. Current time: {current_et.strftime('%I:%M %p ET')}"
+        print(msg)
+        return JSONResponse({"message": msg, "blocked_time": current_et.isoformat()})
+    
+    try:
+        alert_price = float(alert_price_str)
+        if alert_price <= 0:
+            return JSONResponse({"error": "Invalid price received from alert."}, status_code=400)
+    except (ValueError, TypeError):
+        return JSONResponse({"error": f"Invalid price format: {alert_price_str}"}, status_code=400)
+    
+    # Alerts for the same symbol are handled one at a time, so two near
+    # simultaneous alerts can't both pass the position/daily-limit checks
+    async with _SYMBOL_LOCKS[symbol]:
+        return await execute_signal(symbol, action, alert_price, alert_price_str)
 
 # --- Status and Info Endpoints ---
 
-@app.route("/status", methods=["GET"])
-def status():
+@app.get("/status")
+async def status():
     """Returns current status and configuration"""
     current_et = get_current_et_time()
     within_hours = is_within_trading_hours()
     near_close = is_near_market_close()
-    market_open = is_market_open()
+    market_open = await is_market_open()
     
-    positions = get_all_positions()
+    positions = await get_all_positions()
     
     # Check today's trades
-    trades_log = load_daily_trades()
+    trades_log = get_trades_log()
     today_str = date.today().isoformat()
     today_trades = trades_log.get(today_str, {})
     
@@ -552,35 +711,31 @@ def status():
     }
     
     # Add Pacific Time for convenience
-    pt_tz = pytz.timezone('US/Pacific')
-    current_pt = current_et.astimezone(pt_tz)
+    current_pt = current_et.astimezone(PT_TZ)
     status_info["current_time"]["pacific"] = current_pt.strftime("%Y-%m-%d %I:%M:%S %p PT")
     
-    return jsonify(status_info), 200
+    return JSONResponse(status_info)
 
-@app.route("/trades", methods=["GET"])
+@app.get("/trades")
 def trades():
     """Returns recent daily trades log"""
-    trades_log = load_daily_trades()
-    return jsonify({"trades_log": trades_log}), 200
+    trades_log = get_trades_log()
+    return JSONResponse({"trades_log": trades_log})
 
-@app.route("/clear_daily_trades", methods=["POST"])
+@app.post("/clear_daily_trades")
 def clear_daily_trades():
     """Clear today's trades log (for testing or manual override)"""
-    trades_log = load_daily_trades()
     today_str = date.today().isoformat()
     
-    if today_str in trades_log:
-        del trades_log[today_str]
-        save_daily_trades(trades_log)
-        return jsonify({"message": f"Cleared trades for {today_str}"}), 200
+    if clear_trades_for(today_str):
+        return JSONResponse({"message": f"Cleared trades for {today_str}"})
     else:
-        return jsonify({"message": f"No trades found for {today_str}"}), 200
+        return JSONResponse({"message": f"No trades found for {today_str}"})
 
-@app.route("/", methods=["GET"])
+@app.get("/")
 def root():
     """Root endpoint"""
-    return jsonify({
+    return {
         "status": "ok",
         "strategy": STRATEGY_NAME,
         "message": "Breakout Trading Bot is running",
@@ -590,7 +745,9 @@ def root():
             "trades": "/trades (GET)",
             "clear_daily_trades": "/clear_daily_trades (POST)"
         }
-    }), 200
+    }
 
+# Local development only - production runs under gunicorn (see gunicorn.conf.py).
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)), debug=False)
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the Flask webhook servers (app.py, app_live.py,
+app_crypto.py).
+
+gunicorn reads this file from the working directory, so the start command
+is just the module, e.g.:
+
+    gunicorn app_live:app
+
+which runs a single gthread worker with 8 threads. app_live deduplicates
+entry alerts in process (IN_FLIGHT), so it must stay at one worker: with
+two, duplicate alerts landing on different workers would both enter.
+
+Flags passed on the command line (e.g. ``-k uvicorn.workers.UvicornWorker``
+for the FastAPI apps, app_options.py and breakout_bot.py) override the
+values here. Both FastAPI apps must run as a single async worker:
+app_options starts its trade-updates stream and EOD flatten loop once per
+process (two workers would send duplicate closes at the cutoff), and
+breakout_bot keeps its one-trade-per-day log and order queue in process:
+
+    gunicorn -k uvicorn.workers.UvicornWorker -w 1 app_options:app
+    gunicorn -k uvicorn.workers.UvicornWorker -w 1 breakout_bot:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# Threaded workers handle concurrent webhooks instead of one alert at a
+# time like the dev server; the pooled requests Session and the clock cache
+# are shared across threads. To use greenlets instead, install gevent (it is
+# not in the requirements files) and set GUNICORN_WORKER_CLASS=gevent;
+# worker_connections caps those per worker.
+# One worker by default: the apps keep per-process state (app_live's entry
+# dedup) that extra workers would split; threads provide the concurrency.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+worker_connections = 100
+
+# TradingView and the Render proxy reuse connections; keep them open longer
+# than the proxy's idle timeout so requests don't land on a closing socket.
+keepalive = 75